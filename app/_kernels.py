@@ -0,0 +1,71 @@
+# app/_kernels.py
+"""
+Kernels numéricos do caminho quente do /api/submit.
+
+nearest(user, targets, mask) devolve o índice da linha de targets (com
+mask verdadeiro) de menor ||u - t||², ou -1 se nenhuma for válida. Em
+empate, vence a primeira linha.
+
+axes_scores(values, coef) soma values[i] * coef[i, j] por eixo j
+(values: respostas int8 na ordem das linhas de coef, 0 = sem resposta).
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+# Numba é opcional: sem ele, o mesmo cálculo roda vetorizado em NumPy
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - fallback sem numba
+    njit = None
+
+
+def _nearest_numpy(user: np.ndarray, targets: np.ndarray, mask: np.ndarray) -> int:
+    scores = ((user - targets) ** 2).sum(axis=1)
+    scores[~mask] = np.inf
+    best = int(scores.argmin())
+    return best if np.isfinite(scores[best]) else -1
+
+
+def _nearest_loop(user: np.ndarray, targets: np.ndarray, mask: np.ndarray) -> int:
+    best = -1
+    best_score = np.inf
+    for i in range(targets.shape[0]):
+        if not mask[i]:
+            continue
+        score = 0.0
+        for j in range(targets.shape[1]):
+            diff = user[j] - targets[i, j]
+            score += diff * diff
+        if score < best_score:
+            best_score = score
+            best = i
+    return best
+
+
+def _axes_scores_numpy(values: np.ndarray, coef: np.ndarray) -> np.ndarray:
+    return values @ coef
+
+
+def _axes_scores_loop(values: np.ndarray, coef: np.ndarray) -> np.ndarray:
+    out = np.zeros(coef.shape[1], dtype=np.float64)
+    for i in range(coef.shape[0]):
+        v = values[i]
+        if v == 0:
+            continue
+        for j in range(coef.shape[1]):
+            out[j] += v * coef[i, j]
+    return out
+
+
+# Sem fastmath: o conjunto "fast" inclui ninf (a comparação com np.inf
+# vira comportamento indefinido), e contract/reassoc mudam o arredondamento
+# das somas, desfazendo o desempate exato pela ordem dos perfis.
+if njit is not None:
+    nearest = njit(cache=True)(_nearest_loop)
+    axes_scores = njit(cache=True)(_axes_scores_loop)
+else:
+    nearest = _nearest_numpy
+    axes_scores = _axes_scores_numpy
+
@@ -1,9 +1,15 @@
 # app/axis.py
 
 from __future__ import annotations
-from typing import Dict, Mapping
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 import math
 
+import numpy as np
+
+from . import jsoncodec
+from ._kernels import nearest
+
 # ---------------------------------------------------------
 # EIXOS do teste — espaço 5D usado na classificação
 # economic   → Estado vs Mercado
@@ -19,185 +25,138 @@ AXES = ["economic", "social", "community", "method", "pragmatism"]
 # Faixa recomendada: -10 (extremo esquerda/liberdade/status quo)
 #                    +10 (extremo direita/autoridade/comunidade)
 # Esses valores são ajustáveis; servem como coordenadas culturais.
+# Os valores ficam em data/profile_targets.json (ajustes não exigem
+# mexer no código).
 # ---------------------------------------------------------
-PROFILE_TARGETS: Dict[str, Dict[str, float]] = {
-    # Social-democrata pragmático
-    # economic   → centro-esquerda pró-Estado moderado
-    # social     → liberdades civis com alguma ordem
-    # community  → leve pertença comunitária
-    # method     → reformas graduais, baseadas em evidências
-    # pragmatism → muito pragmático
-    "social_democrata_pragmatico": {
-        "economic": -6,
-        "social": -3,
-        "community": +2,
-        "method": -2,
-        "pragmatism": +6,
-    },
-
-    # Liberal clássico, pro-mercado, costumes moderados
-    # economic   → mercado livre forte
-    # social     → moderadamente liberal
-    # community  → neutro
-    # method     → incremental
-    # pragmatism → pragmático
-    "liberal_classico_mercado": {
-        "economic": +8,
-        "social": +1,
-        "community": 0,
-        "method": +2,
-        "pragmatism": +5,
-    },
+PROFILE_TARGETS_PATH = Path(__file__).resolve().parent / "data" / "profile_targets.json"
 
-    # Liberal social — direitos civis + globalismo
-    # economic   → liberal pró-inovação
-    # social     → liberdades máximas
-    # community  → cosmopolita
-    # method     → tecnicista moderado
-    # pragmatism → pragmatismo moderado
-    "liberal_social_cosmopolita": {
-        "economic": +5,
-        "social": -6,
-        "community": -6,
-        "method": -1,
-        "pragmatism": +3,
-    },
-
-    # Tecnocrata pragmático — dados > ideologia
-    # economic   → mercado regulado
-    # social     → neutro
-    # community  → neutro
-    # method     → muito planejado, racionalista
-    # pragmatism → altamente pragmático
-    "tecnocrata_pragmatico": {
-        "economic": +2,
-        "social": -1,
-        "community": 0,
-        "method": -7,
-        "pragmatism": +9,
-    },
-
-    # Empirista conservador — prudência institucional
-    # economic   → pró-mercado sem radicalismo
-    # social     → mais ordem e estabilidade
-    # community  → comunitário moderado
-    # method     → forte incrementalismo
-    # pragmatism → muito pragmático
-    "empirista_conservador": {
-        "economic": +3,
-        "social": +5,
-        "community": +5,
-        "method": +8,
-        "pragmatism": +7,
-    },
+# ---------------------------------------------------------
+# Racional de cada alvo em data/profile_targets.json (o JSON não
+# admite comentários; manter esta lista em sincronia ao ajustar).
+#   social_democrata_pragmatico (Social-democrata pragmático)
+#       economic   → centro-esquerda pró-Estado moderado
+#       social     → liberdades civis com alguma ordem
+#       community  → leve pertença comunitária
+#       method     → reformas graduais, baseadas em evidências
+#       pragmatism → muito pragmático
+#   liberal_classico_mercado (Liberal clássico, pro-mercado, costumes moderados)
+#       economic   → mercado livre forte
+#       social     → moderadamente liberal
+#       community  → neutro
+#       method     → incremental
+#       pragmatism → pragmático
+#   liberal_social_cosmopolita (Liberal social — direitos civis + globalismo)
+#       economic   → liberal pró-inovação
+#       social     → liberdades máximas
+#       community  → cosmopolita
+#       method     → tecnicista moderado
+#       pragmatism → pragmatismo moderado
+#   tecnocrata_pragmatico (Tecnocrata pragmático — dados > ideologia)
+#       economic   → mercado regulado
+#       social     → neutro
+#       community  → neutro
+#       method     → muito planejado, racionalista
+#       pragmatism → altamente pragmático
+#   empirista_conservador (Empirista conservador — prudência institucional)
+#       economic   → pró-mercado sem radicalismo
+#       social     → mais ordem e estabilidade
+#       community  → comunitário moderado
+#       method     → forte incrementalismo
+#       pragmatism → muito pragmático
+#   conservador_comunitario (Conservador comunitário — tradição e pertencimento)
+#       economic   → leve pró-mercado
+#       social     → forte ordem/moralidade
+#       community  → comunitarismo/nacional moderado
+#       method     → incremental forte
+#       pragmatism → alto pragmatismo
+#   direita_libertaria (Direita libertária — máxima liberdade individual)
+#       economic   → livre-mercado extremo
+#       social     → liberdades civis máximas
+#       community  → leve cosmopolitismo
+#       method     → anti-planejamento estatal
+#       pragmatism → pragmatismo médio
+#   direita_autoritaria_nacional (Direita autoritária nacionalista)
+#       economic   → pró-mercado com proteção nacional
+#       social     → autoridade forte
+#       community  → nacionalismo alto
+#       method     → planejamento nacional moderado
+#       pragmatism → pragmatismo médio
+#   esquerda_libertaria_cosmopolita (Esquerda libertária — autonomia e globalismo)
+#       economic   → anti-mercado forte
+#       social     → máxima liberdade
+#       community  → global/cosmopolita
+#       method     → racionalista leve
+#       pragmatism → pouco pragmático (por idealismo leve)
+#   esquerda_comunitaria (Esquerda comunitária igualitária)
+#       economic   → anti-mercado
+#       social     → liberdades, mas com coesão social
+#       community  → comunitário/solidário
+#       method     → racionalismo reformista
+#       pragmatism → pragmatismo moderado
+#   idealista_utopico (Idealista utópico — extremo em princípios)
+#       economic   → variável (0)
+#       social     → variável (0)
+#       community  → variável (0)
+#       method     → engenharia social
+#       pragmatism → idealismo máximo
+#   esquerda_nacional_desenvolvimentista_autoritaria (Esquerda nacional-desenvolvimentista autoritária)
+#       economic   → Estado forte e desenvolvimentista
+#       social     → ordem e controle moderados
+#       community  → nacionalismo popular
+#       method     → planejamento estatal
+#       pragmatism → pragmatismo moderado
+# ---------------------------------------------------------
 
-    # Conservador comunitário — tradição e pertencimento
-    # economic   → leve pró-mercado
-    # social     → forte ordem/moralidade
-    # community  → comunitarismo/nacional moderado
-    # method     → incremental forte
-    # pragmatism → alto pragmatismo
-    "conservador_comunitario": {
-        "economic": +1,
-        "social": +6,
-        "community": +8,
-        "method": +7,
-        "pragmatism": +6,
-    },
+PROFILE_TARGETS: Dict[str, Dict[str, float]] = jsoncodec.load_file(PROFILE_TARGETS_PATH)
 
-    # Direita libertária — máxima liberdade individual
-    # economic   → livre-mercado extremo
-    # social     → liberdades civis máximas
-    # community  → leve cosmopolitismo
-    # method     → anti-planejamento estatal
-    # pragmatism → pragmatismo médio
-    "direita_libertaria": {
-        "economic": +9,
-        "social": -9,
-        "community": -2,
-        "method": -3,
-        "pragmatism": +4,
-    },
+# ---------------------------------------------------------
+# Matriz dos alvos (n_perfis x 5) na ordem de AXES, montada uma
+# única vez no import para a busca vetorizada do perfil mais próximo.
+# float64 e distância direta (u - t)²: as respostas são inteiras e
+# empates exatos acontecem; assim eles seguem resolvidos pela ordem de
+# PROFILE_TARGETS (a forma ||t||²/2 - <u, t> arredonda diferente).
+# ---------------------------------------------------------
+_TARGET_KEYS: List[str] = list(PROFILE_TARGETS.keys())
+_TARGET_MATRIX: np.ndarray = np.array(
+    [[float(PROFILE_TARGETS[key].get(axis, 0.0)) for axis in AXES] for key in _TARGET_KEYS],
+    dtype=np.float64,
+)
 
-    # Direita autoritária nacionalista
-    # economic   → pró-mercado com proteção nacional
-    # social     → autoridade forte
-    # community  → nacionalismo alto
-    # method     → planejamento nacional moderado
-    # pragmatism → pragmatismo médio
-    "direita_autoritaria_nacional": {
-        "economic": +3,
-        "social": +9,
-        "community": +9,
-        "method": +4,
-        "pragmatism": +5,
-    },
 
-    # Esquerda libertária — autonomia e globalismo
-    # economic   → anti-mercado forte
-    # social     → máxima liberdade
-    # community  → global/cosmopolita
-    # method     → racionalista leve
-    # pragmatism → pouco pragmático (por idealismo leve)
-    "esquerda_libertaria_cosmopolita": {
-        "economic": -8,
-        "social": -8,
-        "community": -8,
-        "method": -3,
-        "pragmatism": +2,
-    },
+# Máscara dos alvos para o último profiles_dict visto: na aplicação é
+# sempre o mesmo objeto (load_profiles() em cache), então a máscara é
+# montada uma única vez. Guardar a referência mantém o id() válido.
+_mask_cache: Optional[Tuple[Mapping[str, dict], np.ndarray]] = None
 
-    # Esquerda comunitária igualitária
-    # economic   → anti-mercado
-    # social     → liberdades, mas com coesão social
-    # community  → comunitário/solidário
-    # method     → racionalismo reformista
-    # pragmatism → pragmatismo moderado
-    "esquerda_comunitaria": {
-        "economic": -8,
-        "social": -2,
-        "community": +7,
-        "method": -2,
-        "pragmatism": +3,
-    },
 
-    # Idealista utópico — extremo em princípios
-    # economic   → variável (0)
-    # social     → variável (0)
-    # community  → variável (0)
-    # method     → engenharia social
-    # pragmatism → idealismo máximo
-    "idealista_utopico": {
-        "economic": 0,
-        "social": 0,
-        "community": 0,
-        "method": -4,
-        "pragmatism": -10,
-    },
+def _profiles_mask(profiles_dict: Mapping[str, dict]) -> np.ndarray:
+    """
+    Retorna a máscara booleana (na ordem de _TARGET_KEYS) dos alvos
+    presentes em profiles_dict. Tratar o retorno como somente leitura.
+    """
+    global _mask_cache
+    cache = _mask_cache
+    if cache is not None and cache[0] is profiles_dict:
+        return cache[1]
 
-    # Esquerda nacional-desenvolvimentista autoritária
-    # economic   → Estado forte e desenvolvimentista
-    # social     → ordem e controle moderados
-    # community  → nacionalismo popular
-    # method     → planejamento estatal
-    # pragmatism → pragmatismo moderado
-    "esquerda_nacional_desenvolvimentista_autoritaria": {
-        "economic": -7,
-        "social": +5,
-        "community": +8,
-        "method": -5,
-        "pragmatism": +1,
-    },
-}
+    mask = np.array([key in profiles_dict for key in _TARGET_KEYS], dtype=bool)
+    mask.flags.writeable = False
+    _mask_cache = (profiles_dict, mask)
+    return mask
 
 # ---------------------------------------------------------
-# Normalização: converte pontuação bruta (ex: -16..+16) para -10..+10
+# Normalização: converte pontuação bruta (ex: -14..+14) para -10..+10
 # ---------------------------------------------------------
-def normalize_axes(axes_scores: Mapping[str, float], max_abs: float = 14.0) -> Dict[str, float]:
+# Escala padrão: 7 perguntas * 2 pontos (Likert de -2 a +2). Na aplicação
+# o valor real vem de logic.max_abs_score(), calculado do questions.json.
+DEFAULT_MAX_ABS = 14.0
+
+
+def normalize_axes(axes_scores: Mapping[str, float], max_abs: float = DEFAULT_MAX_ABS) -> Dict[str, float]:
     """
     Normaliza as pontuações brutas dos eixos para a escala -10..10.
-    O valor máximo absoluto considerado é max_abs = 14,
-    correspondente a 7 perguntas * 2 pontos (Likert de -2 a +2).
+    max_abs é o valor absoluto máximo atingível em um eixo
+    (padrão 14 = 7 perguntas * 2 pontos, Likert de -2 a +2).
     
     Nota: valores acima ou abaixo desse limite são automaticamente
     'clamped' para evitar distorções na classificação.
@@ -217,63 +176,60 @@ def normalize_axes(axes_scores: Mapping[str, float], max_abs: float = 14.0) -> D
 
     return norm
 
+# ---------------------------------------------------------
+# Perfil devolvido quando as respostas são todas neutras.
+# Constante compartilhada: tratar como somente leitura.
+# ---------------------------------------------------------
+INCONCLUSIVE_PROFILE: Dict[str, Any] = {
+    "key": "inconclusivo",
+    "label": "Resultado inconclusivo",
+    "description_short": (
+        "Não foi possível identificar um perfil, pois as respostas foram neutras "
+        "ou insuficientes em todos os eixos."
+    ),
+    "description_long": (
+        "Para obter um resultado mais preciso, tente responder às afirmações "
+        "com mais convicção, evitando deixar tudo em neutro."
+    ),
+    "axis_tendencies": {},
+    "authors_classic": [],
+    "figures_modern_international": [],
+    "figures_modern_national": [],
+    "examples_practical": [],
+}
+
 # ---------------------------------------------------------
 # Classificação: encontra o perfil mais próximo
 # usando distância euclidiana no espaço 5D.
 # ---------------------------------------------------------
-def classify_profile(axes_scores: Mapping[str, float], profiles_dict: Dict[str, dict]) -> dict:
+def classify_profile(
+    axes_scores: Mapping[str, float],
+    profiles_dict: Dict[str, dict],
+    max_abs: float = DEFAULT_MAX_ABS,
+) -> dict:
     """
     Recebe os scores brutos dos eixos e retorna o perfil mais próximo.
+    max_abs é repassado a normalize_axes. O perfil devolvido é o próprio
+    objeto de profiles_dict (somente leitura).
     """
     # Caso totalmente neutro/inconclusivo
-    if not axes_scores or all(v == 0 for v in axes_scores.values()):
-        return {
-            "key": "inconclusivo",
-            "label": "Resultado inconclusivo",
-            "description_short": (
-                "Não foi possível identificar um perfil, pois as respostas foram neutras "
-                "ou insuficientes em todos os eixos."
-            ),
-            "description_long": (
-                "Para obter um resultado mais preciso, tente responder às afirmações "
-                "com mais convicção, evitando deixar tudo em neutro."
-            ),
-            "axis_tendencies": {},
-            "authors_classic": [],
-            "figures_modern_international": [],
-            "figures_modern_national": [],
-            "examples_practical": [],
-        }
-
-    norm_axes = normalize_axes(axes_scores)
-
-    best_key = None
-    best_dist = float("inf")
+    if not axes_scores or not any(axes_scores.values()):
+        return INCONCLUSIVE_PROFILE
 
-    for key, target in PROFILE_TARGETS.items():
-
-        # Só considera perfis presentes no profiles.json
-        if key not in profiles_dict:
-            continue
+    norm_axes = normalize_axes(axes_scores, max_abs)
+    user_vec = np.array([norm_axes.get(axis, 0.0) for axis in AXES], dtype=np.float64)
 
-        dist_sq = 0.0
-        for axis in AXES:
-            user_val = norm_axes.get(axis, 0.0)
-            target_val = float(target.get(axis, 0.0))
-            diff = user_val - target_val
-            dist_sq += diff * diff
+    # Só considera perfis presentes no profiles.json
+    best_idx = nearest(user_vec, _TARGET_MATRIX, _profiles_mask(profiles_dict))
 
-        if dist_sq < best_dist:
-            best_dist = dist_sq
-            best_key = key
+    best_key = _TARGET_KEYS[best_idx] if best_idx >= 0 else None
 
     # fallback de segurança
     if best_key is None:
-        any_key = next(iter(profiles_dict.keys()))
-        profile = profiles_dict[any_key].copy()
-        profile["key"] = any_key
-        return profile
+        best_key = next(iter(profiles_dict.keys()))
 
-    profile = profiles_dict[best_key].copy()
-    profile["key"] = best_key
+    # perfis de load_profiles() já trazem "key"; demais recebem uma cópia
+    profile = profiles_dict[best_key]
+    if profile.get("key") != best_key:
+        profile = {**profile, "key": best_key}
     return profile
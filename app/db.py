@@ -1,57 +1,589 @@
 from __future__ import annotations
 
-import json
+import logging
+import os
 import secrets
 import sqlite3
-from datetime import datetime
+import struct
+import threading
+import time
 from pathlib import Path
-from typing import Any, Dict, Optional
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+from . import jsoncodec
+from .axis import AXES
+from .logic import load_questions
+
+logger = logging.getLogger(__name__)
 
 # Caminho do banco local (SQLite) — não armazena nenhum dado pessoal
 DB_PATH = Path(__file__).resolve().parent / "data" / "results.db"
 
+# Colunas desnormalizadas com a pontuação de cada eixo (evita json_extract nas médias)
+SCORE_COLUMNS: Dict[str, str] = {axis: f"score_{axis}" for axis in AXES}
+
 # Alfabeto sem caracteres facilmente confundíveis (0/O/I/l removidos)
 _ALPHABET = "ABCDEFGHJKLMNPQRSTUVWXYZ23456789"
+_ALPHABET_B = _ALPHABET.encode()
 
 
 def generate_result_id() -> str:
     """
     Gera uma chave no formato IDEO-XXXX-YYYY usando fonte criptográfica.
+    Um único token_bytes(8); como len(_ALPHABET) == 32 divide 256,
+    b & 31 mapeia cada byte uniformemente no alfabeto.
+    """
+    chars = bytes(_ALPHABET_B[b & 31] for b in secrets.token_bytes(8)).decode()
+    return f"IDEO-{chars[:4]}-{chars[4:]}"
+
+
+def _utc_timestamp() -> str:
+    """
+    Timestamp UTC em ISO 8601 (precisão de segundos).
+    """
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime())
+
+
+def _dumps(data: Optional[Dict[str, Any]]) -> str:
+    """
+    Serializa um dicionário pequeno em JSON compacto.
     """
-    def _block() -> str:
-        return "".join(secrets.choice(_ALPHABET) for _ in range(4))
+    if not data:
+        return "{}"
+    return jsoncodec.dumps(data)
+
+
+# Uma conexão por thread (o FastAPI executa endpoints síncronos num threadpool)
+_tls = threading.local()
 
-    return f"IDEO-{_block()}-{_block()}"
+
+# ---------------------------------------------------------
+# Respostas compactadas: em vez de JSON, um BLOB com 2 bytes do layout
+# (ordem canônica dos qids, tabela answer_layouts) + 1 byte com sinal
+# por pergunta (-2..+2; _ANSWER_UNSET = não respondida). Respostas fora
+# desse formato (qid desconhecido, valor fora da escala) ficam em JSON.
+# ---------------------------------------------------------
+_ANSWER_UNSET = 127
+_LAYOUT_HEADER = struct.Struct(">H")
+
+
+@lru_cache(maxsize=1)
+def _answers_layout() -> Tuple[int, Dict[str, int]]:
+    """
+    Layout das perguntas atuais: (id em answer_layouts, qid -> posição).
+    """
+    qids = sorted(q["id"] for q_list in load_questions().values() for q in q_list)
+    conn = get_connection()
+    conn.execute("INSERT OR IGNORE INTO answer_layouts (qids) VALUES (?)", (",".join(qids),))
+    row = conn.execute(
+        "SELECT id FROM answer_layouts WHERE qids = ?", (",".join(qids),)
+    ).fetchone()
+    return row["id"], {qid: i for i, qid in enumerate(qids)}
+
+
+@lru_cache(maxsize=None)
+def _layout_qids(layout_id: int) -> List[str]:
+    row = get_connection().execute(
+        "SELECT qids FROM answer_layouts WHERE id = ?", (layout_id,)
+    ).fetchone()
+    return row["qids"].split(",")
+
+
+def _pack_answers(answers: Optional[Dict[str, Any]]) -> Any:
+    if not answers:
+        return "{}"
+
+    layout_id, index = _answers_layout()
+    buf = bytearray([_ANSWER_UNSET]) * len(index)
+    for qid, value in answers.items():
+        pos = index.get(qid)
+        if pos is None or type(value) is not int or not -2 <= value <= 2:
+            return _dumps(answers)
+        buf[pos] = value & 0xFF
+    return _LAYOUT_HEADER.pack(layout_id) + bytes(buf)
+
+
+def _unpack_answers(raw: Any) -> Dict[str, int]:
+    if not raw:
+        return {}
+    if isinstance(raw, str):
+        return jsoncodec.loads(raw)
+
+    (layout_id,) = _LAYOUT_HEADER.unpack_from(raw)
+    qids = _layout_qids(layout_id)
+    return {
+        qids[i]: b - 256 if b > 127 else b
+        for i, b in enumerate(raw[_LAYOUT_HEADER.size:])
+        if b != _ANSWER_UNSET
+    }
 
 
 def get_connection() -> sqlite3.Connection:
-    DB_PATH.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
+    """
+    Retorna a conexão da thread atual, abrindo-a na primeira chamada.
+    A conexão fica em modo autocommit e não deve ser fechada pelo chamador.
+    """
+    conn = getattr(_tls, "conn", None)
+    if conn is None:
+        DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        _tls.conn = conn
     return conn
 
 
 def init_db() -> None:
     """
-    Cria a tabela de resultados, caso ainda não exista.
+    Cria a tabela de resultados, caso ainda não exista, e aplica as
+    migrações de colunas/índices em bancos antigos.
+    """
+    conn = get_connection()
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS results (
+            id TEXT PRIMARY KEY,
+            timestamp TEXT,
+            version TEXT,
+            answers TEXT,
+            scores TEXT,
+            profile_key TEXT,
+            profile_label TEXT,
+            user_locale TEXT,
+            device_type TEXT
+        )
+        """
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS answer_layouts (
+            id INTEGER PRIMARY KEY,
+            qids TEXT UNIQUE
+        )
+        """
+    )
+
+    existing = {row["name"] for row in conn.execute("PRAGMA table_info(results)")}
+    missing = [column for column in SCORE_COLUMNS.values() if column not in existing]
+    for column in missing:
+        conn.execute(f"ALTER TABLE results ADD COLUMN {column} REAL")
+    if missing:
+        _backfill_score_columns(conn)
+
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_results_timestamp ON results(timestamp DESC)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_results_profile ON results(profile_key)"
+    )
+
+    _init_stats_tables(conn)
+
+
+def _backfill_score_columns(conn: sqlite3.Connection) -> None:
+    """
+    Preenche as colunas score_* das linhas antigas a partir do JSON de
+    scores, decodificando cada linha uma única vez (em vez de um
+    json_extract por eixo).
+    """
+    def _as_float(value: Any) -> Optional[float]:
+        try:
+            return float(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    updates = []
+    for row in conn.execute("SELECT id, scores FROM results WHERE scores IS NOT NULL"):
+        try:
+            scores = jsoncodec.loads(row["scores"])
+        except ValueError:
+            continue
+        if not isinstance(scores, dict):
+            continue
+        updates.append(
+            (*(_as_float(scores.get(axis)) for axis in SCORE_COLUMNS), row["id"])
+        )
+
+    assignments = ", ".join(f"{column} = ?" for column in SCORE_COLUMNS.values())
+    conn.execute("BEGIN")
+    try:
+        conn.executemany(f"UPDATE results SET {assignments} WHERE id = ?", updates)
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+# ---------------------------------------------------------
+# Agregados mantidos a cada INSERT/DELETE em results (via triggers), para
+# o /api/stats ler uma linha em vez de varrer a tabela inteira:
+#   results_stats  → total + soma e contagem não nula de cada eixo
+#   profile_counts → quantidade por profile_key (NULL conta como um grupo,
+#                    como no GROUP BY; por isso as comparações usam IS)
+# ---------------------------------------------------------
+def _stats_delta_sql(sign: str, ref: str) -> str:
+    sets = ", ".join(
+        f"sum_{axis} = sum_{axis} {sign} COALESCE({ref}.{column}, 0), "
+        f"n_{axis} = n_{axis} {sign} ({ref}.{column} IS NOT NULL)"
+        for axis, column in SCORE_COLUMNS.items()
+    )
+    return f"UPDATE results_stats SET total = total {sign} 1, {sets} WHERE id = 1;"
+
+
+def _stats_triggers_sql() -> Dict[str, str]:
     """
-    with get_connection() as conn:
+    SQL dos triggers, no formato em que o SQLite o guarda em sqlite_master
+    (permite detectar triggers de uma versão anterior, ex.: eixo novo).
+    """
+    return {
+        "results_stats_insert": (
+            "CREATE TRIGGER results_stats_insert AFTER INSERT ON results\n"
+            "BEGIN\n"
+            f"    {_stats_delta_sql('+', 'NEW')}\n"
+            "    INSERT INTO profile_counts (profile_key, qty) SELECT NEW.profile_key, 0\n"
+            "        WHERE NOT EXISTS (SELECT 1 FROM profile_counts WHERE profile_key IS NEW.profile_key);\n"
+            "    UPDATE profile_counts SET qty = qty + 1 WHERE profile_key IS NEW.profile_key;\n"
+            "END"
+        ),
+        "results_stats_delete": (
+            "CREATE TRIGGER results_stats_delete AFTER DELETE ON results\n"
+            "BEGIN\n"
+            f"    {_stats_delta_sql('-', 'OLD')}\n"
+            "    UPDATE profile_counts SET qty = qty - 1 WHERE profile_key IS OLD.profile_key;\n"
+            "    DELETE FROM profile_counts WHERE profile_key IS OLD.profile_key AND qty <= 0;\n"
+            "END"
+        ),
+    }
+
+
+def _rebuild_stats(conn: sqlite3.Connection) -> None:
+    """
+    Recalcula os agregados a partir das linhas de results.
+    """
+    columns = ", ".join(f"sum_{axis}, n_{axis}" for axis in SCORE_COLUMNS)
+    sums = ", ".join(
+        f"COALESCE(SUM({column}), 0), COUNT({column})" for column in SCORE_COLUMNS.values()
+    )
+    conn.execute("DELETE FROM results_stats")
+    conn.execute(
+        f"INSERT INTO results_stats (id, total, {columns}) SELECT 1, COUNT(*), {sums} FROM results"
+    )
+    conn.execute("DELETE FROM profile_counts")
+    conn.execute(
+        "INSERT INTO profile_counts SELECT profile_key, COUNT(*) FROM results GROUP BY profile_key"
+    )
+
+
+def _init_stats_tables(conn: sqlite3.Connection) -> None:
+    """
+    Cria os agregados e os triggers. Na primeira vez, ou quando os
+    triggers gravados diferem dos atuais (eixo novo em AXES, versão
+    anterior), adiciona as colunas que faltam, recria os triggers e
+    recalcula os agregados a partir de results.
+    """
+    axis_columns = ", ".join(
+        f"sum_{axis} REAL NOT NULL DEFAULT 0, n_{axis} INTEGER NOT NULL DEFAULT 0"
+        for axis in SCORE_COLUMNS
+    )
+    triggers = _stats_triggers_sql()
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS results_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total INTEGER NOT NULL DEFAULT 0,
+                {axis_columns}
+            )
+            """
+        )
         conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS results (
-                id TEXT PRIMARY KEY,
-                timestamp TEXT,
-                version TEXT,
-                answers TEXT,
-                scores TEXT,
-                profile_key TEXT,
-                profile_label TEXT,
-                user_locale TEXT,
-                device_type TEXT
+            CREATE TABLE IF NOT EXISTS profile_counts (
+                profile_key TEXT PRIMARY KEY,
+                qty INTEGER NOT NULL
             )
             """
         )
-        conn.commit()
+
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(results_stats)")}
+        for axis in SCORE_COLUMNS:
+            if f"sum_{axis}" not in existing:
+                conn.execute(f"ALTER TABLE results_stats ADD COLUMN sum_{axis} REAL NOT NULL DEFAULT 0")
+            if f"n_{axis}" not in existing:
+                conn.execute(f"ALTER TABLE results_stats ADD COLUMN n_{axis} INTEGER NOT NULL DEFAULT 0")
+
+        stored = {
+            row["name"]: row["sql"]
+            for row in conn.execute(
+                "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'results'"
+            )
+            if row["name"] in triggers
+        }
+        if stored != triggers:
+            for name in triggers:
+                conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            for sql in triggers.values():
+                conn.execute(sql)
+            _rebuild_stats(conn)
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+# agregados + distribuição + último timestamp numa única consulta
+_STATS_SQL = """
+    SELECT
+        s.*,
+        (SELECT timestamp FROM results ORDER BY timestamp DESC LIMIT 1) AS latest_timestamp,
+        p.profile_key,
+        p.qty
+    FROM results_stats AS s
+    LEFT JOIN profile_counts AS p
+    ORDER BY p.qty DESC
+"""
+
+
+def fetch_stats() -> Dict[str, Any]:
+    """
+    Lê os agregados de results numa única ida ao banco:
+    total, média por eixo, [(profile_key, quantidade)] (do mais frequente
+    ao menos) e o timestamp mais recente.
+    """
+    rows = get_connection().execute(_STATS_SQL).fetchall()
+    if not rows:
+        return {
+            "total": 0,
+            "axes_avg": {axis: None for axis in SCORE_COLUMNS},
+            "profile_counts": [],
+            "latest_timestamp": None,
+        }
+
+    first = rows[0]
+    return {
+        "total": first["total"],
+        "axes_avg": {
+            axis: first[f"sum_{axis}"] / first[f"n_{axis}"] if first[f"n_{axis}"] else None
+            for axis in SCORE_COLUMNS
+        },
+        "profile_counts": [
+            (row["profile_key"], row["qty"]) for row in rows if row["qty"] is not None
+        ],
+        "latest_timestamp": first["latest_timestamp"],
+    }
+
+
+# ---------------------------------------------------------
+# Cache das estatísticas: as estatísticas não são em tempo real, então o
+# resultado vale por _STATS_TTL segundos, sem invalidar a cada save nem
+# forçar o flush da fila de escrita (linhas ainda pendentes, no máximo
+# _FLUSH_INTERVAL segundos de atraso, entram na próxima leitura).
+# ---------------------------------------------------------
+_STATS_TTL = 15.0
+
+_stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+
+
+def cached_stats() -> Dict[str, Any]:
+    """
+    fetch_stats() reaproveitado por até _STATS_TTL segundos.
+    Tratar o retorno como somente leitura.
+    """
+    global _stats_cache
+    now = time.monotonic()
+    cache = _stats_cache
+    if cache is not None and now - cache[0] < _STATS_TTL:
+        return cache[1]
+
+    stats = fetch_stats()
+    _stats_cache = (now, stats)
+    return stats
+
+
+_INSERT_SQL = f"""
+    INSERT INTO results (
+        id, timestamp, version, answers, scores,
+        profile_key, profile_label, user_locale, device_type,
+        {", ".join(SCORE_COLUMNS.values())}
+    ) VALUES ({", ".join("?" * (9 + len(SCORE_COLUMNS)))})
+"""
+
+
+# ---------------------------------------------------------
+# Escrita em lote: com o writer ativo (start_writer), save_result_record
+# apenas enfileira a linha e uma thread de fundo grava tudo numa única
+# transação com executemany a cada _FLUSH_INTERVAL segundos, ou antes,
+# ao acumular _FLUSH_MAX_ROWS linhas. Sem o writer, grava na hora.
+#
+# A fila é do processo: a chave é entregue ao cliente antes do INSERT.
+# Só um processo grava em lote (start_writer trava WRITER_LOCK_PATH); com
+# vários workers (uvicorn --workers N), os demais gravam na hora, e um
+# resultado ainda na fila só fica visível neles após o próximo flush.
+#
+# A fila tem limite (_PENDING_MAX_ROWS): se o flush falhar seguidamente
+# (banco somente leitura, disco cheio...), os saves seguintes voltam a
+# gravar na hora e o erro chega ao cliente em vez de acumular em memória.
+# ---------------------------------------------------------
+WRITER_LOCK_PATH = DB_PATH.with_name(DB_PATH.name + "-writer.lock")
+
+_FLUSH_INTERVAL = 0.05
+_FLUSH_MAX_ROWS = 64
+_PENDING_MAX_ROWS = 1024
+
+_ROW_FIELDS = (
+    "id", "timestamp", "version", "answers", "scores",
+    "profile_key", "profile_label", "user_locale", "device_type",
+    *SCORE_COLUMNS.values(),
+)
+
+_pending: Dict[str, tuple] = {}
+_pending_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_flush_wakeup = threading.Event()
+_writer_stop = threading.Event()
+_writer: Optional[threading.Thread] = None
+_writer_lock_fd: Optional[int] = None
+
+
+def flush_pending() -> None:
+    """
+    Grava as linhas enfileiradas numa única transação.
+    """
+    with _flush_lock:
+        with _pending_lock:
+            rows = list(_pending.values())
+        if not rows:
+            return
+
+        conn = get_connection()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(_INSERT_SQL, rows)
+        except sqlite3.IntegrityError:
+            # outro processo gravou a mesma chave antes do flush (só possível
+            # com vários workers): a chave já foi entregue ao cliente, então
+            # a linha perdida é um erro
+            conn.execute("ROLLBACK")
+            for row in rows:
+                try:
+                    conn.execute(_INSERT_SQL, row)
+                except sqlite3.IntegrityError:
+                    logger.error(
+                        "Resultado %s perdido: chave já gravada por outro processo.", row[0]
+                    )
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+
+        with _pending_lock:
+            for row in rows:
+                _pending.pop(row[0], None)
+
+
+def _writer_loop() -> None:
+    while not _writer_stop.is_set():
+        _flush_wakeup.wait(_FLUSH_INTERVAL)
+        _flush_wakeup.clear()
+        try:
+            flush_pending()
+        except sqlite3.Error:
+            # mantém as linhas pendentes; nova tentativa no próximo ciclo
+            logger.exception("Falha ao gravar resultados em lote.")
+    flush_pending()
+
+
+def _acquire_writer_lock() -> bool:
+    """
+    Garante um único processo gravando em lote neste banco; False se
+    outro processo já estiver com a trava.
+    """
+    global _writer_lock_fd
+    if fcntl is None:
+        return True
+    fd = os.open(WRITER_LOCK_PATH, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return False
+    _writer_lock_fd = fd
+    return True
+
+
+def _release_writer_lock() -> None:
+    global _writer_lock_fd
+    if _writer_lock_fd is not None:
+        os.close(_writer_lock_fd)
+        _writer_lock_fd = None
+
+
+def start_writer() -> None:
+    """
+    Liga a gravação em lote (chamado no startup da aplicação). Se outro
+    processo já estiver com o writer ativo, este segue gravando na hora.
+    """
+    global _writer
+    if _writer is not None:
+        return
+    if not _acquire_writer_lock():
+        logger.info("Gravação em lote ativa em outro processo; gravando resultados na hora.")
+        return
+    _writer_stop.clear()
+    _writer = threading.Thread(target=_writer_loop, name="results-writer", daemon=True)
+    _writer.start()
+
+
+def stop_writer() -> None:
+    """
+    Desliga a gravação em lote, gravando o que estiver pendente.
+    """
+    global _writer
+    if _writer is None:
+        return
+    _writer_stop.set()
+    _flush_wakeup.set()
+    _writer.join()
+    _writer = None
+    _release_writer_lock()
+
+
+def _enqueue(row: tuple) -> Optional[bool]:
+    """
+    Enfileira a linha; False se a chave já existir (no banco ou na fila),
+    None se a fila estiver cheia (o chamador grava na hora).
+    """
+    result_id = row[0]
+    exists = get_connection().execute(
+        "SELECT 1 FROM results WHERE id = ?", (result_id,)
+    ).fetchone()
+    if exists:
+        return False
+
+    with _pending_lock:
+        if result_id in _pending:
+            return False
+        if len(_pending) >= _PENDING_MAX_ROWS:
+            return None
+        _pending[result_id] = row
+        full = len(_pending) >= _FLUSH_MAX_ROWS
+
+    if full:
+        _flush_wakeup.set()
+    return True
 
 
 def save_result_record(
@@ -65,33 +597,36 @@ def save_result_record(
     device_type: Optional[str],
 ) -> str:
     """
-    Persiste o resultado e retorna o ID gerado.
+    Persiste (ou enfileira, com o writer ativo) o resultado e retorna o ID gerado.
     """
     attempts = 0
     while attempts < 5:
         result_id = generate_result_id()
+        row = (
+            result_id,
+            _utc_timestamp(),
+            version,
+            _pack_answers(answers),
+            _dumps(scores),
+            profile_key,
+            profile_label,
+            user_locale,
+            device_type,
+            *(scores.get(axis) if scores else None for axis in SCORE_COLUMNS),
+        )
+
+        if _writer is not None:
+            queued = _enqueue(row)
+            if queued:
+                return result_id
+            if queued is False:
+                attempts += 1
+                continue
+            # fila cheia (flush falhando ou atrasado): grava na hora
+
         try:
-            with get_connection() as conn:
-                conn.execute(
-                    """
-                    INSERT INTO results (
-                        id, timestamp, version, answers, scores,
-                        profile_key, profile_label, user_locale, device_type
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        result_id,
-                        datetime.utcnow().isoformat(),
-                        version,
-                        json.dumps(answers or {}),
-                        json.dumps(scores or {}),
-                        profile_key,
-                        profile_label,
-                        user_locale,
-                        device_type,
-                    ),
-                )
-                conn.commit()
+            # INSERT único em autocommit: a própria instrução é a transação
+            get_connection().execute(_INSERT_SQL, row)
             return result_id
         except sqlite3.IntegrityError:
             # Em caso raríssimo de colisão, tenta novamente
@@ -102,8 +637,14 @@ def save_result_record(
 
 
 def fetch_result_record(result_id: str) -> Optional[Dict[str, Any]]:
-    with get_connection() as conn:
-        row = conn.execute(
+    # resultado recém-salvo ainda na fila de escrita
+    with _pending_lock:
+        pending = _pending.get(result_id)
+
+    if pending is not None:
+        row = dict(zip(_ROW_FIELDS, pending))
+    else:
+        row = get_connection().execute(
             "SELECT * FROM results WHERE id = ?", (result_id,)
         ).fetchone()
 
@@ -114,8 +655,8 @@ def fetch_result_record(result_id: str) -> Optional[Dict[str, Any]]:
         "id": row["id"],
         "timestamp": row["timestamp"],
         "version": row["version"],
-        "answers": json.loads(row["answers"]) if row["answers"] else {},
-        "scores": json.loads(row["scores"]) if row["scores"] else {},
+        "answers": _unpack_answers(row["answers"]),
+        "scores": jsoncodec.loads(row["scores"]) if row["scores"] else {},
         "profile_key": row["profile_key"],
         "profile_label": row["profile_label"],
         "user_locale": row["user_locale"],
@@ -124,40 +665,11 @@ def fetch_result_record(result_id: str) -> Optional[Dict[str, Any]]:
 
 
 def get_stats_summary() -> Dict[str, Any]:
-    with get_connection() as conn:
-        total_row = conn.execute("SELECT COUNT(*) AS total FROM results").fetchone()
-        latest_row = conn.execute(
-            "SELECT timestamp FROM results ORDER BY timestamp DESC LIMIT 1"
-        ).fetchone()
-
-        dist_rows = conn.execute(
-            "SELECT profile_key, COUNT(*) AS qty FROM results GROUP BY profile_key"
-        ).fetchall()
-
-        avg_row = conn.execute(
-            """
-            SELECT
-                AVG(CAST(json_extract(scores, '$.economic') AS REAL)) AS economic,
-                AVG(CAST(json_extract(scores, '$.social') AS REAL)) AS social,
-                AVG(CAST(json_extract(scores, '$.community') AS REAL)) AS community,
-                AVG(CAST(json_extract(scores, '$.method') AS REAL)) AS method,
-                AVG(CAST(json_extract(scores, '$.pragmatism') AS REAL)) AS pragmatism
-            FROM results
-            """
-        ).fetchone()
-
-    profile_distribution = {row["profile_key"]: row["qty"] for row in dist_rows}
-    axes_avg = {
-        "economic": avg_row["economic"],
-        "social": avg_row["social"],
-        "community": avg_row["community"],
-        "method": avg_row["method"],
-        "pragmatism": avg_row["pragmatism"],
-    }
+    stats = cached_stats()
 
     return {
-        "total": total_row["total"] if total_row else 0,
-        "profile_distribution": profile_distribution,
-        "axes_avg": axes_avg,
-        "latest_timestamp": latest_row["timestamp"] if latest_row else None,
+        "total": stats["total"],
+        "profile_distribution": dict(stats["profile_counts"]),
+        "axes_avg": stats["axes_avg"],
+        "latest_timestamp": stats["latest_timestamp"],
     }
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Union
+
+# orjson (codec em C) é opcional: sem ele, caímos para a stdlib
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fallback para a stdlib
+    orjson = None
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    Decodifica JSON a partir de bytes ou str.
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(data: Any) -> str:
+    """
+    Serializa em JSON compacto (sem espaços, UTF-8 sem escapes).
+    """
+    if orjson is not None:
+        return orjson.dumps(data).decode()
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def dumps_bytes(data: Any) -> bytes:
+    """
+    Igual a dumps(), mas já em bytes UTF-8 (pronto para um Response).
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return dumps(data).encode("utf-8")
+
+
+def load_file(path: Union[str, Path]) -> Any:
+    """
+    Lê e decodifica um arquivo JSON (UTF-8).
+    """
+    with open(path, "rb") as f:
+        return loads(f.read())
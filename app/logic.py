@@ -1,7 +1,12 @@
-import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any
-from .axis import classify_profile
+from typing import Dict, Any, List, NamedTuple, Tuple
+
+import numpy as np
+
+from . import jsoncodec
+from ._kernels import axes_scores
+from .axis import AXES, DEFAULT_MAX_ABS, classify_profile
 
 
 
@@ -9,6 +14,7 @@ BASE_DIR = Path(__file__).resolve().parent
 DATA_DIR = BASE_DIR / "data"
 
 
+@lru_cache(maxsize=1)
 def load_questions() -> Dict[str, list]:
     """
     Carrega o questions.json no novo formato:
@@ -17,50 +23,101 @@ def load_questions() -> Dict[str, list]:
       "social": [...],
       ...
     }
+
+    O arquivo é estático: é lido uma única vez e servido da memória
+    (tratar o retorno como somente leitura).
     """
-    with open(DATA_DIR / "questions.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
-    return data
+    return jsoncodec.load_file(DATA_DIR / "questions.json")
 
 
+@lru_cache(maxsize=1)
 def load_profiles() -> dict:
-    with open(DATA_DIR / "profiles.json", "r", encoding="utf-8") as f:
-        return json.load(f)
+    """
+    Carrega o profiles.json uma única vez (retorno somente leitura).
+    Cada perfil já vem com o próprio "key", pronto para ser devolvido
+    por classify_profile sem cópia.
+    """
+    profiles = jsoncodec.load_file(DATA_DIR / "profiles.json")
+    for key, profile in profiles.items():
+        profile["key"] = key
+    return profiles
 
 
-def compute_axes(answers: Dict[str, int], questions_by_axis: Dict[str, list]) -> Dict[str, float]:
+class _CoefIndex(NamedTuple):
+    qid_index: Dict[str, int]       # qid -> linha da matriz
+    axis_names: List[str]           # colunas (AXES + eventuais eixos extras)
+    matrix: np.ndarray              # (n_perguntas, n_eixos) com direction * weight
+
+
+def _build_coef_index(questions_by_axis: Dict[str, list]) -> _CoefIndex:
     """
-    Soma os eixos a partir das respostas.
-    answers: {"EC1": 2, "SO3": -1, ...}
-    questions_by_axis: {"economic": [...], "social": [...], ...}
+    Monta a matriz densa de coeficientes das perguntas, de modo que
+    scores = respostas @ matriz.
     """
-    axes_scores: Dict[str, float] = {
-        "economic": 0.0,
-        "social": 0.0,
-        "community": 0.0,
-        "method": 0.0,
-        "pragmatism": 0.0,
-    }
+    qid_index: Dict[str, int] = {}
+    axis_names: List[str] = list(AXES)
+    entries: List[Tuple[int, int, float]] = []
 
-    # índice id -> question
-    index: Dict[str, Any] = {}
-    for axis_name, q_list in questions_by_axis.items():
+    for q_list in questions_by_axis.values():
         for q in q_list:
-            index[q["id"]] = q
+            row = qid_index.setdefault(q["id"], len(qid_index))
+            for axis_def in q.get("axes", []):
+                name = axis_def["name"]
+                if name not in axis_names:
+                    axis_names.append(name)
+                coef = axis_def.get("direction", 1) * axis_def.get("weight", 1.0)
+                entries.append((row, axis_names.index(name), coef))
 
-    for qid, value in answers.items():
-        question = index.get(qid)
-        if question is None:
-            continue
+    matrix = np.zeros((len(qid_index), len(axis_names)), dtype=np.float64)
+    for row, col, coef in entries:
+        matrix[row, col] += coef
 
-        for axis_def in question.get("axes", []):
-            name = axis_def["name"]
-            direction = axis_def.get("direction", 1)
-            weight = axis_def.get("weight", 1.0)
+    return _CoefIndex(qid_index, axis_names, matrix)
 
-            if name not in axes_scores:
-                axes_scores[name] = 0.0
 
-            axes_scores[name] += value * direction * weight
+@lru_cache(maxsize=1)
+def _coef_index() -> _CoefIndex:
+    """
+    Matriz de coeficientes das perguntas carregadas (montada uma vez).
+    """
+    return _build_coef_index(load_questions())
+
+
+# resposta máxima em módulo na escala Likert (-2..+2)
+LIKERT_MAX = 2
+
+
+@lru_cache(maxsize=1)
+def max_abs_score() -> float:
+    """
+    Maior pontuação bruta absoluta possível em um eixo para o
+    questions.json carregado (LIKERT_MAX * soma dos |coeficientes| do
+    eixo mais carregado). Usada como escala em classify_profile; cai
+    para DEFAULT_MAX_ABS se nenhuma pergunta pontuar eixos.
+    """
+    matrix = _coef_index().matrix
+    if not matrix.size:
+        return DEFAULT_MAX_ABS
+    return float(LIKERT_MAX * np.abs(matrix).sum(axis=0).max()) or DEFAULT_MAX_ABS
+
+
+def compute_axes(answers: Dict[str, int], questions_by_axis: Dict[str, list]) -> Dict[str, float]:
+    """
+    Soma os eixos a partir das respostas.
+    answers: {"EC1": 2, "SO3": -1, ...} (inteiros na escala Likert -2..+2)
+    questions_by_axis: {"economic": [...], "social": [...], ...}
+    """
+    # matriz pré-calculada para o questions.json em cache
+    if questions_by_axis is load_questions():
+        index = _coef_index()
+    else:
+        index = _build_coef_index(questions_by_axis)
+
+    vec = np.zeros(len(index.qid_index), dtype=np.int8)
+    for qid, value in answers.items():
+        row = index.qid_index.get(qid)
+        if row is not None:
+            vec[row] = value
 
-    return axes_scores
\ No newline at end of file
+    scores = axes_scores(vec, index.matrix)
+    return dict(zip(index.axis_names, scores.tolist()))
@@ -1,41 +1,107 @@
-from fastapi import FastAPI, HTTPException
+import hashlib
+import os
+from contextlib import asynccontextmanager
+
+import anyio.to_thread
+from fastapi import Body, FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, ORJSONResponse, Response
 from pathlib import Path
 from pydantic import BaseModel
 from typing import Dict, Any, Optional
 
-from app.db import get_connection
-
-from .logic import load_questions, load_profiles, compute_axes
+from . import jsoncodec
+from .logic import load_questions, load_profiles, compute_axes, max_abs_score
 from .axis import classify_profile
 from .db import (
     init_db,
     save_result_record,
+    cached_stats,
     fetch_result_record,
     get_stats_summary,
+    start_writer,
+    stop_writer,
 )
 
-app = FastAPI(title="Compass MVP")
+
+def _warmup() -> None:
+    """
+    Executa uma vez o caminho do /api/submit para compilar (ou carregar
+    do cache em disco) os kernels Numba antes da primeira requisição.
+    """
+    qid = next((q["id"] for q_list in _questions.values() for q in q_list), None)
+    compute_axes({qid: 1} if qid else {}, _questions)
+    classify_profile({"economic": 1.0}, _profiles, max_abs_score())
+
+
+# Endpoints com SQLite são síncronos (def) e rodam no threadpool do AnyIO;
+# cada thread mantém a própria conexão (ver db.get_connection). O tamanho
+# do pool (padrão do AnyIO: 40) pode ser ajustado com COMPASS_THREADPOOL_SIZE.
+THREADPOOL_SIZE = int(os.environ.get("COMPASS_THREADPOOL_SIZE", "0")) or None
+
+# Gravação em lote (ver db.start_writer): com uvicorn --workers N, só um
+# processo grava em lote e os demais gravam na hora. COMPASS_BATCH_WRITES=0
+# desliga o lote em todos.
+BATCH_WRITES = os.environ.get("COMPASS_BATCH_WRITES", "1") != "0"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if THREADPOOL_SIZE:
+        anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+
+    # garante que a tabela exista ao subir a aplicação
+    init_db()
+    _warmup()
+    # gravação em lote dos resultados (ver db.start_writer)
+    if BATCH_WRITES:
+        start_writer()
+    try:
+        yield
+    finally:
+        stop_writer()
+
+
+# orjson (se instalado) também serializa as respostas JSON dos endpoints
+_DEFAULT_RESPONSE_CLASS = ORJSONResponse if jsoncodec.orjson is not None else JSONResponse
+
+app = FastAPI(
+    title="Compass MVP",
+    lifespan=lifespan,
+    default_response_class=_DEFAULT_RESPONSE_CLASS,
+)
 APP_VERSION = "1.0.0"
 
-# garante que a tabela exista ao subir a aplicação
-init_db()
+# perguntas e perfis são estáticos: carregados uma vez para o processo todo
+_questions = load_questions()
+_profiles = load_profiles()
+
+# CORS para uso local em outras portas: lista fixa de origens (sem curinga,
+# o middleware não precisa refletir o Origin a cada requisição). Outras
+# origens via COMPASS_CORS_ORIGINS, separadas por vírgula.
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.environ.get(
+        "COMPASS_CORS_ORIGINS", "http://localhost:8000,http://127.0.0.1:8000"
+    ).split(",")
+    if origin.strip()
+]
 
-# CORS liberado para uso local (se acessar via file:// ou outras portas)
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
 )
 
 # monta static/
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
 
+# Modelos de corpo só para o schema do OpenAPI: a validação é manual
+# (_parse_answers / _parse_save_payload), sem o custo do Pydantic.
 class AnswersPayload(BaseModel):
     answers: Dict[str, int]
 
@@ -58,36 +124,82 @@ class ResultResponse(BaseModel):
     metadata: Optional[Dict[str, Any]] = None
 
 
+def _request_body_openapi(model: type[BaseModel]) -> Dict[str, Any]:
+    """
+    openapi_extra com o schema do corpo JSON, para endpoints que leem o
+    corpo sem declarar o modelo como parâmetro.
+    """
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}},
+        }
+    }
+
+
+def _etag(content: bytes) -> str:
+    return '"' + hashlib.md5(content).hexdigest() + '"'
+
+
+def _cached_response(
+    request: Request, content: bytes, etag: str, media_type: str, cache_control: str
+) -> Response:
+    """
+    Resposta para conteúdo fixo: 304 sem corpo se o cliente já tem a
+    versão (If-None-Match), senão o conteúdo com ETag e Cache-Control.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in candidates or "*" in candidates:
+            return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+# páginas estáticas lidas uma única vez, servidas direto da memória
+INDEX_PATH = Path("static/index.html")
+QUIZ_PATH = Path("static/quiz.html")
+
+_INDEX_BYTES = INDEX_PATH.read_bytes()
+_QUIZ_BYTES = QUIZ_PATH.read_bytes()
+_INDEX_ETAG = _etag(_INDEX_BYTES)
+_QUIZ_ETAG = _etag(_QUIZ_BYTES)
+
+# HTML revalida a cada acesso (barato: 304 via ETag) para refletir deploys
+_HTML_CACHE_CONTROL = "no-cache"
+
+
 @app.get("/", response_class=HTMLResponse)
-def read_root():
-    index_path = Path("static/index.html")
-    return index_path.read_text(encoding="utf-8")
+def read_root(request: Request):
+    return _cached_response(
+        request, _INDEX_BYTES, _INDEX_ETAG, "text/html; charset=utf-8", _HTML_CACHE_CONTROL
+    )
 
 
 @app.get("/quiz", response_class=HTMLResponse)
-def read_quiz():
-    quiz_path = Path("static/quiz.html")
-    return quiz_path.read_text(encoding="utf-8")
+def read_quiz(request: Request):
+    return _cached_response(
+        request, _QUIZ_BYTES, _QUIZ_ETAG, "text/html; charset=utf-8", _HTML_CACHE_CONTROL
+    )
 
 
-@app.get("/api/questions")
-def get_questions() -> Any:
+def _build_questions_payload() -> Dict[str, Any]:
     """
-    Retorna as perguntas em dois formatos:
+    Monta (uma vez) a resposta de /api/questions em dois formatos:
 
     - questions: lista achatada (array) para o front atual
     - by_axis: mesmas perguntas agrupadas por eixo,
       para futura paginação (economic, social, etc.)
     """
-    questions_by_axis = load_questions()
+    questions_by_axis = _questions
 
-    flat_list = []
-    for axis_name, q_list in questions_by_axis.items():
-        for q in q_list:
-            item = q.copy()
-            # garante que o eixo fica acessível no front
-            item["axis"] = axis_name
-            flat_list.append(item)
+    # garante que o eixo fica acessível no front
+    flat_list = [
+        {**q, "axis": axis_name}
+        for axis_name, q_list in questions_by_axis.items()
+        for q in q_list
+    ]
 
     return {
         "questions": flat_list,      # o front atual usa isso (array)
@@ -95,47 +207,99 @@ def get_questions() -> Any:
     }
 
 
+# as perguntas são estáticas: a resposta é montada e serializada uma única vez
+_QUESTIONS_RESPONSE = _build_questions_payload()
+_QUESTIONS_RESPONSE_BYTES = jsoncodec.dumps_bytes(_QUESTIONS_RESPONSE)
+
+
+_QUESTIONS_ETAG = _etag(_QUESTIONS_RESPONSE_BYTES)
+
+
+@app.get("/api/questions")
+def get_questions(request: Request) -> Response:
+    """
+    Retorna as perguntas (ver _build_questions_payload) já serializadas,
+    ou 304 se o cliente já tiver a mesma versão (ETag).
+    """
+    return _cached_response(
+        request,
+        _QUESTIONS_RESPONSE_BYTES,
+        _QUESTIONS_ETAG,
+        "application/json",
+        "public, max-age=300",
+    )
+
+
+# respostas inconclusivas fixas do /api/submit (somente leitura)
+_INCONCLUSIVE_EMPTY: Dict[str, Any] = {
+    "axes": {},
+    "profile": {
+        "key": "inconclusivo",
+        "label": "Perfil inconclusivo",
+        "description_short": (
+            "Você não respondeu a nenhuma afirmação. "
+            "Para identificar seu perfil, é necessário responder pelo menos parte das perguntas."
+        ),
+    },
+}
+
+_INCONCLUSIVE_HOMOGENEOUS: Dict[str, Any] = {
+    "axes": {},
+    "profile": {
+        "key": "inconclusivo",
+        "label": "Perfil inconclusivo",
+        "description_short": (
+            "Suas respostas foram muito homogêneas (por exemplo, discordo totalmente em todas as afirmações). "
+            "Isso impede identificar um padrão consistente de ideias. "
+            "Tente responder variando entre concordo e discordo conforme cada frase faça sentido para você."
+        ),
+    },
+}
+
+
+def _parse_answers(payload: Any) -> Dict[str, int]:
+    """
+    Valida {"answers": {qid: valor}} sem Pydantic: um único passe
+    conferindo que cada valor é inteiro na escala Likert (-2..+2).
+    """
+    answers = payload.get("answers") if isinstance(payload, dict) else None
+    if not isinstance(answers, dict) or any(
+        type(v) is not int or not -2 <= v <= 2 for v in answers.values()
+    ):
+        raise HTTPException(
+            status_code=422,
+            detail="answers deve ser um objeto {id: inteiro entre -2 e 2}.",
+        )
+    return answers
+
+
+@app.post("/api/submit", openapi_extra=_request_body_openapi(AnswersPayload))
+async def submit_answers(request: Request) -> Any:
+    try:
+        answers = _parse_answers(await request.json())
+    except ValueError:
+        raise HTTPException(status_code=422, detail="JSON inválido.")
+
+    n = len(answers)
 
-@app.post("/api/submit")
-def submit_answers(payload: AnswersPayload) -> Any:
-    questions = load_questions()
-    profiles = load_profiles()
-    # 0) Pega todos os valores respondidos
-    values = list(payload.answers.values())
-    
     # 1) Nenhuma resposta preenchida → perfil inconclusivo
-    if not payload.answers:
-        return {
-            "axes": {},
-            "profile": {
-                "key": "inconclusivo",
-                "label": "Perfil inconclusivo",
-                "description_short": (
-                    "Você não respondeu a nenhuma afirmação. "
-                    "Para identificar seu perfil, é necessário responder pelo menos parte das perguntas."
-                ),
-            },
-        }
+    if n == 0:
+        return _INCONCLUSIVE_EMPTY
 
     # 2) Se a pessoa marcou tudo igual (-2 em tudo, ou tudo 0, ou tudo +2)
-    if values and all(v == values[0] for v in values):
-        return {
-            "axes": {},
-            "profile": {
-                "key": "inconclusivo",
-                "label": "Perfil inconclusivo",
-                "description_short": (
-                    "Suas respostas foram muito homogêneas (por exemplo, discordo totalmente em todas as afirmações). "
-                    "Isso impede identificar um padrão consistente de ideias. "
-                    "Tente responder variando entre concordo e discordo conforme cada frase faça sentido para você."
-                ),
-            },
-        }
+    # (para respostas variadas, o caso comum, parar na primeira diferença
+    # sai mais barato que len(set(...)) == 1, que sempre percorre tudo).
+    # Uma única resposta segue para o fluxo normal.
+    if n > 1:
+        values = iter(answers.values())
+        first = next(values)
+        if all(v == first for v in values):
+            return _INCONCLUSIVE_HOMOGENEOUS
 
     # 3) Fluxo normal (se passou nos testes acima)
 
-    axes_scores = compute_axes(payload.answers, questions)
-    profile = classify_profile(axes_scores, profiles)
+    axes_scores = compute_axes(answers, _questions)
+    profile = classify_profile(axes_scores, _profiles, max_abs_score())
 
     return {
         "axes": axes_scores,
@@ -143,31 +307,75 @@ def submit_answers(payload: AnswersPayload) -> Any:
     }
 
 
-@app.post("/api/save_result", response_model=SaveResultResponse)
-def save_result(payload: SaveResultPayload) -> Any:
+def _is_number(v: Any) -> bool:
+    return type(v) in (int, float)
+
+
+def _parse_save_payload(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Confere manualmente o formato de SaveResultPayload (sem o custo da
+    validação do Pydantic) e devolve os campos já prontos para gravar.
+    Tipos estritos: números em string (ex.: "2") retornam 422.
+    """
+    answers = raw.get("answers")
+    scores = raw.get("scores")
+    profile_key = raw.get("profile_key")
+    profile_label = raw.get("profile_label")
+    locale = raw.get("locale")
+    device = raw.get("device")
+    if (
+        not isinstance(answers, dict)
+        or any(type(v) is not int for v in answers.values())
+        or not isinstance(scores, dict)
+        or not all(_is_number(v) for v in scores.values())
+        or not isinstance(profile_key, str)
+        or not isinstance(profile_label, str)
+        or any(v is not None and not isinstance(v, str) for v in (locale, device))
+    ):
+        raise HTTPException(status_code=422, detail="Payload de resultado inválido.")
+
+    return {
+        "answers": answers,
+        "scores": {k: float(v) for k, v in scores.items()},
+        "profile_key": profile_key,
+        "profile_label": profile_label,
+        "locale": locale,
+        "device": device,
+    }
+
+
+@app.post(
+    "/api/save_result",
+    responses={200: {"model": SaveResultResponse}},
+    openapi_extra=_request_body_openapi(SaveResultPayload),
+)
+def save_result(raw: Dict[str, Any] = Body(...)) -> Any:
     """
     Persiste o resultado de forma anônima e retorna a chave de recuperação.
     """
+    payload = _parse_save_payload(raw)
+
     # perfil pode mudar de versão, mas guardamos o rótulo enviado
-    profile_label = payload.profile_label
-    profiles = load_profiles()
-    if not profile_label and payload.profile_key in profiles:
-        profile_label = profiles[payload.profile_key].get("label", payload.profile_key)
+    profile_label = (
+        payload["profile_label"]
+        or _profiles.get(payload["profile_key"], {}).get("label")
+        or payload["profile_key"]
+    )
 
     result_id = save_result_record(
-        answers=payload.answers or {},
-        scores=payload.scores or {},
+        answers=payload["answers"],
+        scores=payload["scores"],
         version=APP_VERSION,
-        profile_key=payload.profile_key,
-        profile_label=profile_label or payload.profile_key,
-        user_locale=payload.locale,
-        device_type=payload.device,
+        profile_key=payload["profile_key"],
+        profile_label=profile_label,
+        user_locale=payload["locale"],
+        device_type=payload["device"],
     )
 
     return {"result_id": result_id}
 
 
-@app.get("/api/result/{result_id}", response_model=ResultResponse)
+@app.get("/api/result/{result_id}", responses={200: {"model": ResultResponse}})
 def get_result(result_id: str) -> Any:
     """
     Recupera um resultado salvo a partir da chave pública.
@@ -176,8 +384,7 @@ def get_result(result_id: str) -> Any:
     if not record:
         raise HTTPException(status_code=404, detail="Resultado não encontrado.")
 
-    profiles = load_profiles()
-    profile = profiles.get(record["profile_key"], {})
+    profile = _profiles.get(record["profile_key"], {})
     profile_with_meta = {
         **profile,
         "key": record["profile_key"],
@@ -202,48 +409,16 @@ def get_result(result_id: str) -> Any:
 
 @app.get("/api/stats")
 def get_stats():
-    conn = get_connection()
-    cur = conn.cursor()
-
-    # total de testes registrados
-    cur.execute("SELECT COUNT(*) FROM results")
-    total = cur.fetchone()[0]
-
-    # distribuição de perfis
-    cur.execute("""
-        SELECT profile_key, COUNT(*) 
-        FROM results 
-        GROUP BY profile_key 
-        ORDER BY COUNT(*) DESC
-    """)
+    # total, distribuição de perfis e média dos eixos (cache curto, ver db)
+    stats = cached_stats()
+
     profiles = [
-        {"profile": row[0], "count": row[1]}
-        for row in cur.fetchall()
+        {"profile": profile_key, "count": qty}
+        for profile_key, qty in stats["profile_counts"]
     ]
 
-    # média dos eixos
-    cur.execute("""
-        SELECT 
-            AVG(CAST(json_extract(scores, '$.economic') AS FLOAT)),
-            AVG(CAST(json_extract(scores, '$.social') AS FLOAT)),
-            AVG(CAST(json_extract(scores, '$.community') AS FLOAT)),
-            AVG(CAST(json_extract(scores, '$.method') AS FLOAT)),
-            AVG(CAST(json_extract(scores, '$.pragmatism') AS FLOAT))
-        FROM results
-    """)
-    avg_scores_row = cur.fetchone()
-    avg_scores = {
-        "economic": avg_scores_row[0],
-        "social": avg_scores_row[1],
-        "community": avg_scores_row[2],
-        "method": avg_scores_row[3],
-        "pragmatism": avg_scores_row[4],
-    }
-
-    conn.close()
-
     return {
-        "total_results": total,
+        "total_results": stats["total"],
         "profile_distribution": profiles,
-        "average_scores": avg_scores
-    }
\ No newline at end of file
+        "average_scores": stats["axes_avg"]
+    }